@@ -1,4 +1,5 @@
 import re
+import time
 import logging
 import functools
 from collections import namedtuple
@@ -17,23 +18,50 @@ DirectAliasBase = namedtuple("DirectAlias", "pk name")
 
 BEST = 'CERM FORM INKA KASS NF PR SEKR VC'.split()
 
+# Every title starts with a prefix letter (KGBOT), EFU, FU, BEST or a BEST title
+_TITLE_FIRST_CHARS = frozenset('KGBOTEF') | {b[0] for b in BEST}
+
+_SPLIT_RE = re.compile(r'([+-])')
+_DIRECT_RE = re.compile(r'^DIRECTUSER(\d+)$')
+_EFU_RE = re.compile(r'^E?FU\w+$')
+_PREFIX_VALUE = dict(K=-1, G=1, B=2, O=3, T=1)
+# Character replacements applied to recipient names before parsing
+_NORMALIZE = str.maketrans({
+    '$': 'S',  # KA$$ -> KASS hack
+})
+
+# Number of seconds to reuse the current period before refetching
+PERIOD_CACHE_TTL = 300
+
 
 class GroupAlias(GroupAliasBase):
+    __slots__ = ()
+
     def __str__(self):
         return self.name
 
 
 class PeriodAlias(PeriodAliasBase):
+    __slots__ = ()
+
     def __str__(self):
         return '%s%s' % (self.kind, self.period)
 
 
 class DirectAlias(DirectAliasBase):
+    __slots__ = ()
+
     def __str__(self):
         return 'DIRECTUSER%s' % self.pk
 
 
 def get_current_period(db=None):
+    """Return the current period, refetched every PERIOD_CACHE_TTL seconds."""
+
+    now = time.monotonic()
+    fetched_at = get_current_period.fetched_at
+    if fetched_at is not None and now - fetched_at <= PERIOD_CACHE_TTL:
+        return get_current_period.cached_value
     if db is None:
         db = tkmail.database.Database()
     try:
@@ -44,6 +72,7 @@ def get_current_period(db=None):
             "Failed to get current period from database, " +
             "reusing cached value %r", get_current_period.cached_value)
     else:
+        get_current_period.fetched_at = now
         if get_current_period.cached_value != old_value:
             if old_value is not None:
                 logging.info("Current period changed from %r to %r",
@@ -51,6 +80,7 @@ def get_current_period(db=None):
     return get_current_period.cached_value
 
 get_current_period.cached_value = None
+get_current_period.fetched_at = None
 
 
 def get_admin_emails():
@@ -94,9 +124,9 @@ def translate_recipient(year, name, list_ids=False):
     ['...@post.au.dk']
     """
 
-    name = name.replace('$', 'S')  # KA$$ -> KASS hack
+    name = name.translate(_NORMALIZE).upper()
     db = tkmail.database.Database()
-    recipient_ids, origin = parse_recipient(name.upper(), db, year)
+    recipient_ids, origin = parse_recipient(name, db, year)
     assert isinstance(recipient_ids, list) and isinstance(origin, list)
     assert len(recipient_ids) == len(origin)
     email_addresses = db.get_email_addresses(recipient_ids)
@@ -113,14 +143,31 @@ def parse_recipient(recipient, db, current_period):
     And return the set of person indexes that are to receive the email.
     """
 
+    # Splitting on the signs gives the list [name, sign, name, sign, ...]
+    # where a name may be empty, e.g. at the start of "-FU+BEST".
+    parts = _SPLIT_RE.split(recipient)
+    terms = []
+    for sign, name in zip(['+'] + parts[1::2], parts[::2]):
+        if not name:
+            continue
+        lookup, source = match_alias(name, db, current_period)
+        terms.append((sign, name, lookup, source))
+
+    # Perform the database lookups of all matched aliases at once
+    members = _lookup_members(
+        db, [lookup for sign, name, lookup, source in terms
+             if lookup is not None])
+
     personIdOps = []
     invalid_recipients = []
-    for sign, name in re.findall(r'([+-]?)([^+-]+)', recipient):
-        try:
-            personIds, source = parse_alias(name, db, current_period)
-            personIdOps.append((sign or '+', personIds, source))
-        except InvalidRecipient as e:
-            invalid_recipients.append(e.args[0])
+    for sign, name, lookup, source in terms:
+        personIds = members[lookup] if lookup is not None else None
+        if personIds:
+            personIdOps.append((sign, personIds, source))
+        else:
+            # Either no alias matched, or no users in the database
+            # fit the matched alias
+            invalid_recipients.append(name)
 
     if invalid_recipients:
         raise InvalidRecipient(invalid_recipients)
@@ -129,100 +176,202 @@ def parse_recipient(recipient, db, current_period):
     origin = {}
     for sign, personIds, source in personIdOps:
         if sign == '+':  # union
-            recipient_ids = recipient_ids.union(personIds)
-            for p in personIds:
-                origin[p] = source
+            recipient_ids.update(personIds)
+            origin.update(dict.fromkeys(personIds, source))
         else:  # minus
-            recipient_ids = recipient_ids.difference(personIds)
-            for p in personIds:
-                origin.pop(p, None)
+            # origin has the same keys as recipient_ids,
+            # so only the removed IDs need to be popped.
+            removed = recipient_ids.intersection(personIds)
+            recipient_ids.difference_update(removed)
+            for p in removed:
+                del origin[p]
 
     recipient_ids = sorted(recipient_ids)
     if not recipient_ids:
         raise InvalidRecipient(recipient)
-    return recipient_ids, [origin[r] for r in recipient_ids]
+    return recipient_ids, list(map(origin.__getitem__, recipient_ids))
+
+
+@functools.lru_cache(maxsize=4)
+def _compile_groups(rows):
+    """Compile the group regexps of the rows returned by db.get_groups().
+
+    Returns a pair (groups, combined), where groups is a list of
+    (groupId, name, compiled regexp) for all groups, and combined is
+    one compiled alternation of all the group regexps.
+    The result is cached, so the regexps are only compiled again
+    when the groups in the database change.
+    """
+
+    groups = [(int(groupId), name, re.compile('^(?:%s)$' % groupRegexp))
+              for groupId, name, groupRegexp in rows]
+    # A single alternation of all group regexps, where the alternative
+    # for groups[i] is the named group "g<i>".
+    combined = re.compile('|'.join(
+        '(?P<g%d>%s)' % (i, groupRegexp)
+        for i, (groupId, name, groupRegexp) in enumerate(rows)))
+    return groups, combined
 
 
 def parse_alias_group(alias, db, current_period):
-    groups = db.get_groups()
-    matches = []
-    for groupId, name, groupRegexp in groups:
-        groupId = int(groupId)
-        regexp = '^(?P<name>%s)$' % groupRegexp
-        mo = re.match(regexp, alias)
-        if mo:
-            # We cannot use a lambda that closes over groupId
-            # since the captured groupId would change in the next iteration.
-            matches.append(
-                (functools.partial(db.get_group_members, groupId),
-                 GroupAlias(name)))
-
-    if len(matches) > 1:
+    groups, combined = _compile_groups(db.get_groups())
+    mo = combined.fullmatch(alias)
+    if mo is None or mo.lastgroup is None:
+        return None, None
+
+    # The outermost group of the matching alternative is the last group
+    # to close, so lastgroup names the first group whose regexp matches.
+    # Only the groups after it can also match the alias.
+    i = int(mo.lastgroup[1:])
+    if any(pattern.match(alias) for _, _, pattern in groups[i+1:]):
         raise ValueError("The alias %r matches more than one group"
                          % alias)
 
-    if matches:
-        return matches[0]
-    return None, None
+    groupId, name, pattern = groups[i]
+    return ('group', groupId), GroupAlias(name)
+
+
+def try_parse_title(alias, current_period):
+    """Like tk.parse, but return None if alias is not a title.
 
+    tk.parse signals this by raising ValueError, so it is only called
+    for aliases that start like a title.
+    """
 
-def parse_alias_title(alias, db, current_period):
+    if not alias or alias[0] not in _TITLE_FIRST_CHARS:
+        return None
     try:
-        base, period = tk.parse(alias, current_period)
+        return tk.parse(alias, current_period)
     except ValueError:
+        return None
+
+
+def parse_alias_title(alias, current_period):
+    parsed = try_parse_title(alias, current_period)
+    if parsed is None:
         return None, None
+    base, period = parsed
     if base == 'BESTFU':
-        def f():
-            return (db.get_bestfu_members('BEST', period) +
-                    db.get_bestfu_members('FU', period))
+        lookup = ('bestfu_union', period)
     elif base == alias == "BEST":
-        def f():
-            return db.get_current_bestfu_members(base, period)
+        lookup = ('current_bestfu', base, period)
     elif base == alias and base in BEST:
-        def f():
-            return db.get_current_bestfu_member(base, period)
+        lookup = ('current_title', base, period)
     elif base in ('BEST', 'FU', 'EFU'):
-        def f():
-            return db.get_bestfu_members(base, period)
-    elif base in BEST or re.match(r'^E?FU\w+$', base):
-        def f():
-            return db.get_user_by_title(base, period)
+        lookup = ('bestfu', base, period)
+    elif base in BEST or _EFU_RE.match(base):
+        lookup = ('title', base, period)
     else:
         return None, None
 
-    return f, PeriodAlias('BESTFU', period, alias)
+    return lookup, PeriodAlias('BESTFU', period, alias)
 
 
-def parse_alias_direct_user(alias, db, current_period):
-    mo = re.match(r'^DIRECTUSER(\d+)$', alias)
+def parse_alias_direct_user(alias, current_period):
+    mo = _DIRECT_RE.match(alias)
     if mo is not None:
         pk = int(mo.group(1))
-        return (lambda: db.get_user_by_id(pk)), DirectAlias(pk, alias)
+        return ('direct', pk), DirectAlias(pk, alias)
     return None, None
 
 
-def parse_alias(alias, db, current_period):
-    """
-    Evaluates the alias, returning a non-empty list of person IDs.
-    Raise exception if a spam or no match email.
+@functools.lru_cache(maxsize=1024)
+def _resolve_alias_kind(alias, current_period):
+    """Resolve an alias that does not depend on the groups in the database.
+
+    Returns a pair (lookup, canonical), where lookup is a tuple describing
+    the database lookup to perform (see _lookup_members),
+    or (None, None) if alias is not a title or a direct user alias.
     """
 
     # Try these functions until one matches
     matchers = [
-        parse_alias_group,
-        parse_alias_title,
         parse_alias_direct_user,
+        parse_alias_title,
     ]
 
     for f in matchers:
-        match, canonical = f(alias, db, current_period)
-        if match is not None:
-            break
-    else:
+        lookup, canonical = f(alias, current_period)
+        if lookup is not None:
+            return lookup, canonical
+    return None, None
+
+
+def _lookup_member(db, lookup):
+    """Perform a lookup that has no bulk version in the database."""
+
+    kind, *args = lookup
+    if kind == 'bestfu_union':
+        return db.get_bestfu_members_union(*args)
+    elif kind == 'current_bestfu':
+        return db.get_current_bestfu_members(*args)
+    elif kind == 'current_title':
+        return db.get_current_bestfu_member(*args)
+    raise ValueError(kind)
+
+
+def _lookup_members(db, lookups):
+    """Perform the database lookups described by the tuples in lookups.
+
+    Duplicate lookups are performed once, and lookups of the same kind
+    are combined into a single query when the database has a bulk version
+    of the lookup.
+    Returns a dict mapping each lookup to a list of person IDs.
+    """
+
+    bulk = {
+        'group': db.get_group_members_bulk,
+        'bestfu': db.get_bestfu_members_bulk,
+        'title': db.get_user_by_title_bulk,
+        'direct': db.get_user_by_id_bulk,
+    }
+    by_kind = {}
+    # Perform each distinct lookup only once, e.g. for "BEST+FORM-BEST"
+    for lookup in dict.fromkeys(lookups):
+        by_kind.setdefault(lookup[0], []).append(lookup)
+
+    result = {}
+    for kind, kind_lookups in by_kind.items():
+        if kind in bulk:
+            args_list = [lookup[1:] for lookup in kind_lookups]
+            result.update(zip(kind_lookups, bulk[kind](args_list)))
+        else:
+            for lookup in kind_lookups:
+                result[lookup] = _lookup_member(db, lookup)
+    return result
+
+
+def match_alias(alias, db, current_period):
+    """
+    Find the lookup to perform for the alias without performing it.
+    Returns a pair (lookup, canonical) or (None, None) if nothing matches.
+    """
+
+    # DIRECTUSER<pk> is reserved for direct user aliases,
+    # so there is no need to try the groups for those.
+    # Otherwise groups take precedence over titles such as FORM.
+    if not alias.startswith('DIRECTUSER'):
+        lookup, canonical = parse_alias_group(alias, db, current_period)
+        if lookup is not None:
+            return lookup, canonical
+
+    # The groups are read from the database, so only the remaining
+    # matchers can be cached across calls.
+    return _resolve_alias_kind(alias, current_period)
+
+
+def parse_alias(alias, db, current_period):
+    """
+    Evaluates the alias, returning a non-empty list of person IDs.
+    Raise exception if a spam or no match email.
+    """
+
+    lookup, canonical = match_alias(alias, db, current_period)
+    if lookup is None:
         raise InvalidRecipient(alias)
 
     # Perform database lookup according to matched alias
-    person_ids = match()
+    person_ids = _lookup_members(db, [lookup])[lookup]
     if not person_ids:
         # No users in the database fit the matched alias
         raise InvalidRecipient(alias)
@@ -266,11 +415,26 @@ def get_period(prefix, postfix, current_period):
         else:
             raise InvalidRecipient(postfix)
 
-    # Now evaluate the prefix:
-    prefix_value = dict(K=-1, G=1, B=2, O=3, T=1)
-    grad = 0
-    for base, exponent in re.findall(r"([KGBOT])([0-9]*)", prefix):
-        exponent = int(exponent or 1)
-        grad += prefix_value[base] * exponent
+    return period - _prefix_grad(prefix)
 
-    return period - grad
+
+@functools.lru_cache(maxsize=256)
+def _prefix_grad(prefix):
+    """
+    Evaluate the prefix, which is a sequence of letters in _PREFIX_VALUE,
+    each followed by an optional exponent. Other characters are ignored.
+    """
+
+    grad = 0
+    i, n = 0, len(prefix)
+    while i < n:
+        value = _PREFIX_VALUE.get(prefix[i])
+        i += 1
+        if value is None:
+            continue
+        j = i
+        while j < n and '0' <= prefix[j] <= '9':
+            j += 1
+        grad += value * (int(prefix[i:j]) if j > i else 1)
+        i = j
+    return grad
@@ -9,6 +9,7 @@ class Database(object):
         self._mysql = MySQLdb.connect(host=HOSTNAME, user=USERNAME,
                                       passwd=PASSWORD, db=DATABASE)
         self._cursor = self._mysql.cursor()
+        self._groups = None
 
     def _execute(self, statement, *args):
         if args:
@@ -27,6 +28,22 @@ class Database(object):
         else:
             return list(rows)
 
+    def _fetchall_bulk(self, statement, args_list):
+        """Run a single-column SELECT once for each tuple in args_list.
+
+        The statements are combined into one query using UNION ALL.
+        Returns a list with the selected values for each tuple in args_list.
+        """
+
+        results = [[] for args in args_list]
+        if args_list:
+            sql = ' UNION ALL '.join(
+                'SELECT %d, `q`.* FROM (%s) AS `q`' % (i, statement % args)
+                for i, args in enumerate(args_list))
+            for i, value in self._fetchall(sql):
+                results[i].append(value)
+        return results
+
     def get_email_addresses(self, id_list):
         id_string = ','.join(str(each) for each in id_list)
         return self._fetchall("""
@@ -65,11 +82,15 @@ class Database(object):
         (122, 'USERID[0-9]+'), (126, '(8|OTT(END)?E)'), (128, 'J60'),
         (129, 'J60KOOR'), (130, 'INKA'), (131, 'HAPPENING'), (132, 'TKIT'),
         (134, '(TK)?SY'), (136, 'ABEN'), (137, 'J60REVY')]
+
+        The groups are only fetched once for each Database object.
         """
 
-        return self._fetchall("""
-            SELECT `id`, `name`, `regexp` FROM idm_group
-            """)
+        if self._groups is None:
+            self._groups = tuple(self._fetchall("""
+                SELECT `id`, `name`, `regexp` FROM idm_group
+                """))
+        return self._groups
 
     def get_group_members(self, group_id):
         return self._fetchall("""
@@ -77,6 +98,17 @@ class Database(object):
             WHERE `group_id`='%s'
             """, group_id, column=0)
 
+    def get_group_members_bulk(self, args_list):
+        """Bulk version of get_group_members.
+
+        Takes a list of (group_id,) tuples and returns a list of results.
+        """
+
+        return self._fetchall_bulk("""
+            SELECT `profile_id` FROM `idm_profile_groups`
+            WHERE `group_id`='%s'
+            """, args_list)
+
     def get_current_bestfu_members(self, kind, period):
         if kind == "BEST" and period == 2022 and self.get_ginka_standin_2022():
             best = self.get_bestfu_members(kind, period)
@@ -96,18 +128,59 @@ class Database(object):
             WHERE `period` = '%s' AND `kind` = '%s'
             """, period, kind, column=0)
 
+    def get_bestfu_members_union(self, period):
+        return self._fetchall("""
+            SELECT `profile_id` FROM `idm_title`
+            WHERE `period` = '%s' AND `kind` IN ('BEST', 'FU')
+            """, period, column=0)
+
+    def get_bestfu_members_bulk(self, args_list):
+        """Bulk version of get_bestfu_members.
+
+        Takes a list of (kind, period) tuples and returns a list of results.
+        """
+
+        for kind, period in args_list:
+            assert kind in ('BEST', 'FU', 'EFU')
+        return self._fetchall_bulk("""
+            SELECT `profile_id` FROM `idm_title`
+            WHERE `period` = '%s' AND `kind` = '%s'
+            """, [(period, kind) for kind, period in args_list])
+
     def get_user_by_title(self, title, period):
         return self._fetchall("""
             SELECT `profile_id` FROM `idm_title`
             WHERE `root` = '%s' AND `period` = '%s'
             """, title, period, column=0)
 
+    def get_user_by_title_bulk(self, args_list):
+        """Bulk version of get_user_by_title.
+
+        Takes a list of (title, period) tuples and returns a list of results.
+        """
+
+        return self._fetchall_bulk("""
+            SELECT `profile_id` FROM `idm_title`
+            WHERE `root` = '%s' AND `period` = '%s'
+            """, args_list)
+
     def get_user_by_id(self, user_id):
         return self._fetchall("""
             SELECT `id` FROM `idm_profile`
             WHERE `id`='%s'
             """, user_id, column=0)
 
+    def get_user_by_id_bulk(self, args_list):
+        """Bulk version of get_user_by_id.
+
+        Takes a list of (user_id,) tuples and returns a list of results.
+        """
+
+        return self._fetchall_bulk("""
+            SELECT `id` FROM `idm_profile`
+            WHERE `id`='%s'
+            """, args_list)
+
     def get_all_best(self, period):
         """Get all BEST members.
 
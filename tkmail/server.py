@@ -2,7 +2,8 @@ import os
 import re
 import sys
 import json
-import datetime
+import time
+import logging
 import textwrap
 import itertools
 import traceback
@@ -30,10 +31,16 @@ from emailtunnel.mailhole import MailholeRelayMixin
 RecipientGroup = namedtuple(
     'RecipientGroup', 'origin recipients'.split())
 
+_TK_ADDRESS = re.compile(r'@(T)AAGE(K)AMMERET\.dk$', re.I)
+_REFERENCES_WHITESPACE = re.compile(r'(<[^<> \n\r\t]*)([ \n\r\t]+)')
+_FROM_DOMAIN = re.compile(r'@([^ \t\n>]+)')
+
 
 def now_string():
     """Return the current date and time as a string."""
-    return datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S.%f")
+    t = time.time()
+    return '%s.%06d' % (time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime(t)),
+                        int(t % 1 * 1e6))
 
 
 class TKForwarder(SMTPForwarder, MailholeRelayMixin):
@@ -90,6 +97,9 @@ class TKForwarder(SMTPForwarder, MailholeRelayMixin):
             self.host, self.port, self.relay_host, self.relay_port, self.year)
 
     def log_receipt(self, peer, envelope):
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
         mailfrom = envelope.mailfrom
         message = envelope.message
 
@@ -102,23 +112,21 @@ class TKForwarder(SMTPForwarder, MailholeRelayMixin):
             recipients_header = OrderedDict()
             for address, formatted, header in envelope.recipients():
                 if address is not None:
-                    address = re.sub(r'@(T)AAGE(K)AMMERET\.dk$', r'@@\1\2',
-                                     address, 0, re.I)
+                    address = _TK_ADDRESS.sub(r'@@\1\2', address)
                     recipients_header.setdefault(header, []).append(address)
-            recipients = ' '.join(
+            recipients = ' '.join([
                 '%s: <%s>' % (header, '>, <'.join(group))
-                for header, group in recipients_header.items())
+                for header, group in recipients_header.items()])
         except Exception as exn:
             logger.exception('Envelope.recipients() processing failed')
             rcpttos = envelope.rcpttos
             if type(rcpttos) == list and all(type(x) == str for x in rcpttos):
-                rcpttos = [re.sub(r'@(T)AAGE(K)AMMERET\.dk$', r'@@\1\2',
-                                  address, 0, re.I)
+                rcpttos = [_TK_ADDRESS.sub(r'@@\1\2', address)
                            for address in rcpttos]
                 if len(rcpttos) == 1:
                     recipients = '<%s>' % rcpttos[0]
                 else:
-                    recipients = ', '.join('<%s>' % x for x in rcpttos)
+                    recipients = ', '.join(['<%s>' % x for x in rcpttos])
             else:
                 recipients = repr(rcpttos)
             recipients = 'To: ' + recipients
@@ -126,6 +134,10 @@ class TKForwarder(SMTPForwarder, MailholeRelayMixin):
         logger.info("%s", recipients)
 
     def log_delivery(self, message, recipients, sender):
+        if not logger.isEnabledFor(logging.INFO):
+            self.delivered += 1
+            return
+
         if all('@' in rcpt for rcpt in recipients):
             parts = [rcpt.split('@', 1) for rcpt in recipients]
             parts.sort(key=lambda x: (x[1].lower(), x[0].lower()))
@@ -134,11 +146,11 @@ class TKForwarder(SMTPForwarder, MailholeRelayMixin):
                 for domain, aa in itertools.groupby(
                     parts, key=lambda x: x[1])
             ]
-            recipients_string = ', '.join(
+            recipients_string = ', '.join([
                 '<%s@%s>' % (','.join(aa), domain)
-                for domain, aa in by_domain)
+                for domain, aa in by_domain])
         else:
-            recipients_string = ', '.join('<%s>' % x for x in recipients)
+            recipients_string = ', '.join(['<%s>' % x for x in recipients])
 
         if len(recipients_string) > 200:
             age = self.deliver_recipients.get(recipients_string)
@@ -252,7 +264,7 @@ class TKForwarder(SMTPForwarder, MailholeRelayMixin):
         fixed_header = []
         for v in references_header:
             # Move space/newline in front of the '<'.
-            v2 = re.sub(r'(<[^<> \n\r\t]*)([ \n\r\t]+)', r'\2\1', v)
+            v2 = _REFERENCES_WHITESPACE.sub(r'\2\1', v)
             if v != v2:
                 # We had to move some whitespace to fix the header,
                 # so we may inadvertently have created new too-long lines.
@@ -279,8 +291,8 @@ class TKForwarder(SMTPForwarder, MailholeRelayMixin):
         message.set_unique_header('References', v2)
 
     def get_from_domain(self, envelope):
-        from_domain_mo = re.search(r'@([^ \t\n>]+)',
-                                   envelope.message.get_header('From', ''))
+        from_domain_mo = _FROM_DOMAIN.search(
+            envelope.message.get_header('From', ''))
         if from_domain_mo:
             return from_domain_mo.group(1)
 
@@ -295,10 +307,11 @@ class TKForwarder(SMTPForwarder, MailholeRelayMixin):
         if not recipients:
             logger.info("%s resolved to the empty list", name)
             raise InvalidRecipient(rcptto)
-        recipients.sort(key=lambda r: origin[r])
-        group_iter = itertools.groupby(recipients, key=lambda r: origin[r])
+        by_origin = OrderedDict()
+        for r in recipients:
+            by_origin.setdefault(origin[r], []).append(r)
         groups = [RecipientGroup(origin=o, recipients=frozenset(group))
-                  for o, group in group_iter]
+                  for o, group in by_origin.items()]
         return groups
 
     def get_group_recipients(self, group):
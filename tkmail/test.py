@@ -23,8 +23,8 @@ def configure_logging():
 
 
 def deliver_local(message, recipients, sender):
-    logger.info("deliver_local: From: %r To: %r Subject: %r" %
-                (sender, recipients, str(message.subject)))
+    logger.info("deliver_local: From: %r To: %r Subject: %r",
+                sender, recipients, str(message.subject))
     for recipient in recipients:
         if '@' not in recipient:
             raise smtplib.SMTPDataError(0, 'No @ in %r' % recipient)
@@ -33,8 +33,8 @@ def deliver_local(message, recipients, sender):
 
 
 def forward_local(original_envelope, message, recipients, sender):
-    logger.info("forward_local: From: %r To: %r Subject: %r" %
-                (sender, recipients, str(message.subject)))
+    logger.info("forward_local: From: %r To: %r Subject: %r",
+                sender, recipients, str(message.subject))
     for recipient in recipients:
         if '@' not in recipient:
             raise smtplib.SMTPDataError(0, 'No @ in %r' % recipient)
@@ -436,7 +436,7 @@ def main():
 
     logger.debug("Sleep for a bit...")
     time.sleep(1)
-    logger.debug("%s envelopes" % len(envelopes))
+    logger.debug("%s envelopes", len(envelopes))
 
     for envelope in envelopes:
         try:
@@ -457,10 +457,10 @@ def main():
             e = test_envelopes[test_id]
             test.check_envelopes(e)
         except AssertionError as e:
-            logger.exception("Test %s failed: %s" % (i, e))
+            logger.exception("Test %s failed: %s", i, e)
             failures += 1
         else:
-            logger.info("Test %s succeeded" % i)
+            logger.info("Test %s succeeded", i)
 
     if failures:
         logger.error("%s failures", failures)